@@ -1,6 +1,8 @@
 use crate::config_file::parse_regexes;
 use pyo3::{pyclass, pymethods, PyResult};
+use regex::RegexSet;
 use regex_cache::LazyRegex;
+use std::borrow::Cow;
 use std::path::PathBuf;
 
 /// Automation rules that determine when commands should execute
@@ -25,6 +27,8 @@ pub struct Auto {
     pub path: Vec<PathBuf>,
     pub regex: Vec<LazyRegex>,
     pub always: Option<bool>,
+    /// `regex` compiled into a single set, built by `compile_regex_set` once the config is loaded
+    pub regex_set: Option<RegexSet>,
 }
 
 #[cfg_attr(feature = "stub_gen", pyo3_stub_gen::derive::gen_stub_pymethods)]
@@ -45,6 +49,7 @@ impl Auto {
             path,
             always,
             regex: parse_regexes(regex)?,
+            regex_set: None,
         })
     }
 
@@ -73,3 +78,21 @@ impl Auto {
         self.always.unwrap_or(false)
     }
 }
+
+impl Auto {
+    /// Compiles all regex patterns into a single `RegexSet`, kept for every later selection
+    pub fn compile_regex_set(&mut self) -> Result<(), regex::Error> {
+        self.regex_set = Some(RegexSet::new(self.regex())?);
+        Ok(())
+    }
+
+    /// Returns all regex patterns combined into a single `RegexSet`
+    ///
+    /// Uses the set built by `compile_regex_set`, and only compiles one if it wasn't called.
+    pub fn regex_set(&self) -> Result<Cow<'_, RegexSet>, regex::Error> {
+        match &self.regex_set {
+            Some(set) => Ok(Cow::Borrowed(set)),
+            None => Ok(Cow::Owned(RegexSet::new(self.regex())?)),
+        }
+    }
+}
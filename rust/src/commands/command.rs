@@ -1,7 +1,7 @@
 use crate::commands::auto::Auto;
+use crate::commands::next_id;
 use pyo3::{pyclass, pymethods};
 use std::path::PathBuf;
-use uuid::Uuid;
 
 /// A single executable task with its configuration and automation rules
 ///
@@ -36,7 +36,7 @@ pub struct Command {
 #[pymethods]
 impl Command {
     #[new]
-    #[pyo3(signature = (name, cmd, id = Uuid::new_v4().to_string(), cwd = PathBuf::new(), interactive = false, auto = Auto::default()))]
+    #[pyo3(signature = (name, cmd, id = next_id(), cwd = PathBuf::new(), interactive = false, auto = Auto::default()))]
     pub fn new(
         name: String,
         cmd: String,
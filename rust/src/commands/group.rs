@@ -1,9 +1,9 @@
 use crate::commands::auto::Auto;
 use crate::commands::command::Command;
+use crate::commands::next_id;
 use crate::config_file::{ConfigCommandGroup, ConfigError};
 use pyo3::{pyclass, pymethods};
 use std::path::PathBuf;
-use uuid::Uuid;
 
 /// Hierarchical grouping of related commands
 ///
@@ -42,7 +42,7 @@ pub struct CommandGroup {
 #[pymethods]
 impl CommandGroup {
     #[new]
-    #[pyo3(signature = (name, id = Uuid::new_v4().to_string(), auto = Auto::default(), cwd = PathBuf::new(), commands = Vec::new(), children = Vec::new()))]
+    #[pyo3(signature = (name, id = next_id(), auto = Auto::default(), cwd = PathBuf::new(), commands = Vec::new(), children = Vec::new()))]
     fn new(
         name: String,
         id: String,
@@ -62,17 +62,109 @@ impl CommandGroup {
     }
 
     fn as_yaml(&self) -> Result<String, ConfigError> {
-        let config_group: ConfigCommandGroup = self.clone().into();
+        let config_group: ConfigCommandGroup = self.into();
         config_group.as_yaml()
     }
 }
 
 impl CommandGroup {
     /// Returns a flattened list of all commands in this group and its children
+    ///
+    /// Commands are returned depth-first, in the order they are declared.
     pub fn all_commands(&self) -> Vec<&Command> {
-        self.commands
-            .iter()
-            .chain(self.children.iter().flat_map(|child| child.all_commands()))
-            .collect()
+        let mut commands = Vec::new();
+        let mut stack = vec![self];
+        while let Some(group) = stack.pop() {
+            commands.extend(group.commands.iter());
+            // Push children in reverse, so the first child is visited next
+            stack.extend(group.children.iter().rev());
+        }
+        commands
+    }
+
+    /// Returns a flattened list of mutable references to all commands in this group and its children
+    ///
+    /// Commands are returned in the same order as `all_commands`.
+    pub fn all_commands_mut(&mut self) -> Vec<&mut Command> {
+        let mut commands = Vec::new();
+        let mut stack = vec![self];
+        while let Some(group) = stack.pop() {
+            commands.extend(group.commands.iter_mut());
+            stack.extend(group.children.iter_mut().rev());
+        }
+        commands
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn command(name: &str) -> Command {
+        Command {
+            id: name.to_string(),
+            name: name.to_string(),
+            ..Default::default()
+        }
+    }
+
+    fn group(name: &str, commands: Vec<Command>, children: Vec<CommandGroup>) -> CommandGroup {
+        CommandGroup {
+            id: name.to_string(),
+            name: name.to_string(),
+            commands,
+            children,
+            ..Default::default()
+        }
+    }
+
+    #[test]
+    fn test_all_commands_order() {
+        let root = group(
+            "root",
+            vec![command("a")],
+            vec![
+                group(
+                    "first",
+                    vec![command("b")],
+                    vec![group("nested", vec![command("c")], vec![])],
+                ),
+                group("second", vec![command("d"), command("e")], vec![]),
+            ],
+        );
+
+        let names = root
+            .all_commands()
+            .into_iter()
+            .map(|c| c.name.as_str())
+            .collect::<Vec<_>>();
+
+        assert_eq!(names, vec!["a", "b", "c", "d", "e"]);
+    }
+
+    #[test]
+    fn test_all_commands_mut_order() {
+        let mut root = group(
+            "root",
+            vec![command("a")],
+            vec![
+                group("first", vec![command("b")], vec![]),
+                group("second", vec![command("c")], vec![]),
+            ],
+        );
+
+        let names = root
+            .all_commands_mut()
+            .into_iter()
+            .map(|c| c.name.clone())
+            .collect::<Vec<_>>();
+
+        assert_eq!(names, vec!["a", "b", "c"]);
+    }
+
+    #[test]
+    fn test_all_commands_empty() {
+        let root = group("root", vec![], vec![group("child", vec![], vec![])]);
+        assert!(root.all_commands().is_empty());
     }
 }
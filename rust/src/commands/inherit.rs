@@ -4,6 +4,7 @@ use crate::commands::group::CommandGroup;
 use crate::config_file::ConfigError;
 use std::io;
 use std::path::PathBuf;
+use std::rc::Rc;
 
 pub fn inherit_path(parent: &PathBuf, child: PathBuf) -> PathBuf {
     if child == PathBuf::new() {
@@ -15,15 +16,29 @@ pub fn inherit_path(parent: &PathBuf, child: PathBuf) -> PathBuf {
     }
 }
 
+/// A segment of the path to a config entry, linked to the segment of its parent
+///
+/// Every node in the config tree extends the entry path of its parent, but the path is only
+/// rendered when reporting an error, so nodes share their parent's segments instead of copying them.
+struct EntryPath {
+    parent: Option<Rc<EntryPath>>,
+    name: String,
+}
+
 #[derive(Default, Clone)]
 pub struct Inheritance {
     cwd: PathBuf,
     auto: Auto,
-    entry_path: Vec<String>,
+    entry_path: Option<Rc<EntryPath>>,
+    /// Whether `cwd` and `auto.path` have already been checked and canonicalized
+    canonical: bool,
 }
 
 impl Inheritance {
     fn canonicalize(&mut self) -> Result<(), io::Error> {
+        if self.canonical {
+            return Ok(());
+        }
         if self.cwd != PathBuf::new() {
             self.cwd.canonicalize()?;
         }
@@ -33,13 +48,26 @@ impl Inheritance {
             .iter()
             .map(|p| inherit_path(&self.cwd, p.clone()).canonicalize())
             .collect::<Result<Vec<PathBuf>, io::Error>>()?;
+        self.canonical = true;
         Ok(())
     }
 
-    fn merge_entry_path(&self, entry: &str) -> Vec<String> {
-        let mut new_entry_path = self.entry_path.clone();
-        new_entry_path.push(entry.to_string());
-        new_entry_path
+    fn merge_entry_path(&self, entry: &str) -> Option<Rc<EntryPath>> {
+        Some(Rc::new(EntryPath {
+            parent: self.entry_path.clone(),
+            name: entry.to_string(),
+        }))
+    }
+
+    fn entry(&self) -> String {
+        let mut names = Vec::new();
+        let mut segment = self.entry_path.as_deref();
+        while let Some(entry_path) = segment {
+            names.push(entry_path.name.as_str());
+            segment = entry_path.parent.as_deref();
+        }
+        names.reverse();
+        names.join(".")
     }
 }
 
@@ -55,16 +83,17 @@ impl From<PathBuf> for Inheritance {
 /// A trait for types that can inherit settings from another instance, or another type, eg command from command group
 pub trait Inheritable: Sized {
     fn calculate_inheritance(&self, inheritance: &Inheritance) -> Result<Inheritance, ConfigError>;
-    fn apply_inheritance(&mut self, inheritance: &Inheritance) -> Result<(), ConfigError>;
+    /// Applies a calculated inheritance, taking ownership so the merged values can be moved in
+    fn apply_inheritance(&mut self, inheritance: Inheritance) -> Result<(), ConfigError>;
     fn inherit(&mut self, inheritance: &Inheritance) -> Result<(), ConfigError> {
         let mut inherited = self.calculate_inheritance(inheritance)?;
         inherited
             .canonicalize()
             .map_err(|_| ConfigError::DirectoryNotFound {
                 path: inherited.cwd.clone(),
-                entry: inherited.entry_path.join("."),
+                entry: inherited.entry(),
             })?;
-        self.apply_inheritance(&inherited)
+        self.apply_inheritance(inherited)
     }
 }
 
@@ -75,10 +104,10 @@ impl Auto {
         } else {
             self.path.clone()
         };
-        let regex = if self.regex.is_empty() {
-            other.regex.clone()
+        let (regex, regex_set) = if self.regex.is_empty() {
+            (other.regex.clone(), other.regex_set.clone())
         } else {
-            self.regex.clone()
+            (self.regex.clone(), self.regex_set.clone())
         };
         Auto {
             watch: self.watch.or(other.watch),
@@ -86,38 +115,43 @@ impl Auto {
             path,
             regex,
             always: self.always.or(other.always),
+            regex_set,
         }
     }
 }
 
 impl Inheritable for Auto {
     fn calculate_inheritance(&self, inheritance: &Inheritance) -> Result<Inheritance, ConfigError> {
-        // Only inherit auto settings if the parent has either watch or git enabled
-        let mut auto =
+        // Only inherit auto settings if the parent has either watch or git enabled.
+        //
+        // The owning command/group has already merged these settings into `inheritance.auto`, and
+        // merging is idempotent, so that result can be reused instead of merging a second time.
+        // Its paths are canonical by then as well, so they don't have to be resolved again.
+        let (mut auto, mut canonical) =
             if inheritance.auto.watch.unwrap_or(false) || inheritance.auto.git.unwrap_or(false) {
-                self.merge(&inheritance.auto)
+                (inheritance.auto.clone(), inheritance.canonical)
             } else {
-                self.clone()
+                (self.clone(), false)
             };
 
         // If the path is empty, inherit the cwd from the parent
         if auto.path.is_empty() {
             auto.path.push(inheritance.cwd.clone());
+            canonical = false;
         }
 
         Ok(Inheritance {
             cwd: inheritance.cwd.clone(),
             auto,
             entry_path: inheritance.merge_entry_path("auto"),
+            canonical,
         })
     }
 
-    fn apply_inheritance(&mut self, inheritance: &Inheritance) -> Result<(), ConfigError> {
-        self.watch = inheritance.auto.watch;
-        self.git = inheritance.auto.git;
-        self.path = inheritance.auto.path.clone();
-        self.regex = inheritance.auto.regex.clone();
-        self.always = inheritance.auto.always;
+    fn apply_inheritance(&mut self, inheritance: Inheritance) -> Result<(), ConfigError> {
+        // The calculated settings are already merged and canonical, so move them in as a whole
+        // instead of cloning the paths and regexes a second time
+        *self = inheritance.auto;
 
         Ok(())
     }
@@ -129,12 +163,13 @@ impl Inheritable for Command {
             cwd: inherit_path(&inheritance.cwd, self.cwd.clone()),
             auto: self.auto.merge(&inheritance.auto),
             entry_path: inheritance.merge_entry_path(&self.name),
+            canonical: false,
         })
     }
 
-    fn apply_inheritance(&mut self, inheritance: &Inheritance) -> Result<(), ConfigError> {
+    fn apply_inheritance(&mut self, inheritance: Inheritance) -> Result<(), ConfigError> {
         self.cwd = inheritance.cwd.clone();
-        self.auto.inherit(inheritance)?;
+        self.auto.inherit(&inheritance)?;
         Ok(())
     }
 }
@@ -145,17 +180,18 @@ impl Inheritable for CommandGroup {
             cwd: inherit_path(&inheritance.cwd, self.cwd.clone()),
             auto: self.auto.merge(&inheritance.auto),
             entry_path: inheritance.merge_entry_path(&self.name),
+            canonical: false,
         })
     }
 
-    fn apply_inheritance(&mut self, inheritance: &Inheritance) -> Result<(), ConfigError> {
+    fn apply_inheritance(&mut self, inheritance: Inheritance) -> Result<(), ConfigError> {
         self.cwd = inheritance.cwd.clone();
-        self.auto.inherit(inheritance)?;
+        self.auto.inherit(&inheritance)?;
         for command in &mut self.commands {
-            command.inherit(inheritance)?;
+            command.inherit(&inheritance)?;
         }
         for child in &mut self.children {
-            child.inherit(inheritance)?;
+            child.inherit(&inheritance)?;
         }
         Ok(())
     }
@@ -167,6 +203,7 @@ mod tests {
     use crate::commands::command::Command;
     use crate::commands::group::CommandGroup;
     use crate::commands::inherit::{Inheritable, Inheritance};
+    use crate::config_file::ConfigError;
     use std::fs;
     use std::path::PathBuf;
     use tempfile::TempDir;
@@ -241,6 +278,7 @@ mod tests {
             path: vec![],
             regex: vec![],
             always: Some(false),
+            regex_set: None,
         };
         let mut group = CommandGroup {
             id: "1".to_string(),
@@ -276,6 +314,7 @@ mod tests {
             path: vec![root.clone()],
             regex: vec![],
             always: Some(false),
+            regex_set: None,
         };
 
         let child_group = CommandGroup {
@@ -327,6 +366,7 @@ mod tests {
             path: vec![],
             regex: vec![],
             always: Some(false),
+            regex_set: None,
         };
 
         let mut group = CommandGroup {
@@ -429,6 +469,34 @@ mod tests {
         assert_eq!(parent_group.cwd, PathBuf::from("/root"));
     }
 
+    #[test]
+    fn test_missing_directory_reports_entry_path() {
+        let temp = TempDir::new().unwrap();
+        let root = temp.path().to_path_buf();
+
+        let mut group = CommandGroup {
+            id: "1".to_string(),
+            name: "parent".to_string(),
+            auto: Auto::default(),
+            cwd: root.clone(),
+            commands: vec![],
+            children: vec![CommandGroup {
+                id: "2".to_string(),
+                name: "child".to_string(),
+                auto: Auto::default(),
+                cwd: PathBuf::from("missing"),
+                commands: vec![],
+                children: vec![],
+            }],
+        };
+
+        let error = group.inherit(&Inheritance::from(root.clone())).unwrap_err();
+        match error {
+            ConfigError::DirectoryNotFound { entry, .. } => assert_eq!(entry, "parent.child"),
+            other => panic!("Unexpected error: {:?}", other),
+        }
+    }
+
     #[test]
     fn test_empty_auto_path_should_inherit_parent_command_path() {
         let temp = TempDir::new().unwrap();
@@ -448,6 +516,7 @@ mod tests {
                 path: vec![],
                 regex: vec![],
                 always: Some(false),
+                regex_set: None,
             },
         };
 
@@ -472,6 +541,7 @@ mod tests {
                 path: vec![],
                 regex: vec![],
                 always: Some(false),
+                regex_set: None,
             },
             cwd: root.clone(),
             commands: vec![Command {
@@ -486,6 +556,7 @@ mod tests {
                     path: vec![],
                     regex: vec![],
                     always: Some(false),
+                    regex_set: None,
                 },
             }],
             children: vec![],
@@ -503,6 +574,7 @@ mod tests {
                 path: vec![root.clone()],
                 regex: vec![],
                 always: Some(false),
+                regex_set: None,
             },
             cwd: root.clone(),
             commands: vec![Command {
@@ -517,6 +589,7 @@ mod tests {
                     path: vec![],
                     regex: vec![],
                     always: Some(false),
+                    regex_set: None,
                 },
             }],
             children: vec![],
@@ -7,7 +7,45 @@
 //! The inheritance system allows automation rules and working directories to flow down from
 //! parent groups to their children, while still allowing override at any level.
 
+use std::sync::atomic::{AtomicUsize, Ordering};
+
 pub mod auto;
 pub mod command;
 pub mod group;
 pub mod inherit;
+
+static ID_COUNTER: AtomicUsize = AtomicUsize::new(0);
+
+/// Prefix of generated ids
+///
+/// It starts with a control character, which a config file can only contain as an escape sequence,
+/// so generated ids don't collide with the ids users configure (like `fnug-1`).
+const GENERATED_ID_PREFIX: &str = "\u{1f}fnug-";
+
+/// Returns a new id for commands and groups that don't configure one
+///
+/// Ids only have to be unique within a single run, so a counter is enough.
+pub fn next_id() -> String {
+    format!(
+        "{}{}",
+        GENERATED_ID_PREFIX,
+        ID_COUNTER.fetch_add(1, Ordering::Relaxed)
+    )
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_next_id_is_unique() {
+        assert_ne!(next_id(), next_id());
+    }
+
+    #[test]
+    fn test_next_id_cant_be_typed() {
+        let id = next_id();
+        assert!(id.starts_with(GENERATED_ID_PREFIX));
+        assert!(id.chars().next().unwrap().is_control());
+    }
+}
@@ -7,25 +7,36 @@
 use crate::commands::auto::Auto;
 use crate::commands::command::Command;
 use crate::commands::group::CommandGroup;
+use crate::commands::next_id;
 use log::{debug, info};
 use pyo3::PyErr;
 use regex_cache::LazyRegex;
 use serde::{Deserialize, Serialize};
+use std::collections::HashSet;
+use std::ffi::{OsStr, OsString};
 use std::path::PathBuf;
 use thiserror::Error;
-use uuid::Uuid;
 
 /// Errors that can occur while loading configuration
 #[derive(Error, Debug)]
 pub enum ConfigError {
     #[error("No config file found in current directory or its parents: {0}")]
     ConfigNotFound(PathBuf),
+    #[error("Config file not found: {0}")]
+    ConfigFileNotFound(PathBuf),
     #[error("Unable to find directory: {path:?} (entry: {entry:?})")]
     DirectoryNotFound { entry: String, path: PathBuf },
     #[error("Unknown working directory: {0}")]
     UnknownWorkingDirectory(String),
+    #[error("Unable to read {path:?}: {source}")]
+    Io {
+        path: PathBuf,
+        source: std::io::Error,
+    },
     #[error("Unable to parse config file")]
     Serde(#[from] serde_yaml::Error),
+    #[error("Unable to parse JSON config file")]
+    Json(#[from] serde_json::Error),
     #[error("Invalid regex pattern: {0}")]
     Regex(#[from] regex::Error),
 }
@@ -37,6 +48,10 @@ impl From<ConfigError> for PyErr {
                 "Error parsing config file: {:?}",
                 err
             )),
+            ConfigError::Json(err) => pyo3::exceptions::PyValueError::new_err(format!(
+                "Error parsing config file: {:?}",
+                err
+            )),
             ConfigError::UnknownWorkingDirectory(path) => pyo3::exceptions::PyValueError::new_err(
                 format!("Unknown working directory: {:?}", path),
             ),
@@ -50,12 +65,22 @@ impl From<ConfigError> for PyErr {
                     path
                 ))
             }
+            ConfigError::ConfigFileNotFound(path) => {
+                pyo3::exceptions::PyFileNotFoundError::new_err(format!(
+                    "Config file not found: {:?}",
+                    path
+                ))
+            }
             ConfigError::DirectoryNotFound { path, entry } => {
                 pyo3::exceptions::PyFileNotFoundError::new_err(format!(
                     "Unable to find directory: {:?} (entry: {:?})",
                     path, entry
                 ))
             }
+            ConfigError::Io { path, source } => pyo3::exceptions::PyOSError::new_err(format!(
+                "Unable to read {:?}: {}",
+                path, source
+            )),
         }
     }
 }
@@ -89,19 +114,24 @@ pub fn parse_regexes(regex: Vec<String>) -> Result<Vec<LazyRegex>, ConfigError>
 
 #[derive(Debug, Deserialize, Serialize, Clone, Default)]
 pub struct ConfigAuto {
+    #[serde(skip_serializing_if = "Option::is_none")]
     pub watch: Option<bool>,
+    #[serde(skip_serializing_if = "Option::is_none")]
     pub git: Option<bool>,
+    #[serde(skip_serializing_if = "Option::is_none")]
     pub path: Option<Vec<PathBuf>>,
+    #[serde(skip_serializing_if = "Option::is_none")]
     pub regex: Option<Vec<String>>,
+    #[serde(skip_serializing_if = "Option::is_none")]
     pub always: Option<bool>,
 }
 
-impl From<Auto> for ConfigAuto {
-    fn from(auto: Auto) -> Self {
+impl From<&Auto> for ConfigAuto {
+    fn from(auto: &Auto) -> Self {
         ConfigAuto {
             watch: auto.watch,
             git: auto.git,
-            path: Some(auto.path),
+            path: Some(auto.path.clone()),
             regex: Some(auto.regex.iter().map(|r| r.to_string()).collect()),
             always: auto.always,
         }
@@ -119,6 +149,7 @@ impl TryInto<Auto> for ConfigAuto {
             git: self.git,
             path: self.path.unwrap_or_default(),
             always: self.always,
+            regex_set: None,
         })
     }
 }
@@ -135,23 +166,27 @@ impl TryInto<Auto> for ConfigAuto {
 /// ```
 #[derive(Debug, Deserialize, Serialize)]
 pub struct ConfigCommand {
+    #[serde(skip_serializing_if = "Option::is_none")]
     pub id: Option<String>,
     pub name: String,
+    #[serde(skip_serializing_if = "Option::is_none")]
     pub cwd: Option<PathBuf>,
     pub cmd: String,
+    #[serde(skip_serializing_if = "Option::is_none")]
     pub interactive: Option<bool>,
+    #[serde(skip_serializing_if = "Option::is_none")]
     pub auto: Option<ConfigAuto>,
 }
 
-impl From<Command> for ConfigCommand {
-    fn from(command: Command) -> Self {
+impl From<&Command> for ConfigCommand {
+    fn from(command: &Command) -> Self {
         ConfigCommand {
-            id: Some(command.id),
-            name: command.name,
-            cwd: Some(command.cwd),
-            cmd: command.cmd,
+            id: Some(command.id.clone()),
+            name: command.name.clone(),
+            cwd: Some(command.cwd.clone()),
+            cmd: command.cmd.clone(),
             interactive: Some(command.interactive),
-            auto: Some(command.auto.into()),
+            auto: Some((&command.auto).into()),
         }
     }
 }
@@ -164,7 +199,7 @@ impl TryInto<Command> for ConfigCommand {
             cwd: self.cwd.unwrap_or_default(),
             auto: self.auto.unwrap_or_default().try_into()?,
             cmd: self.cmd,
-            id: self.id.unwrap_or_else(|| Uuid::new_v4().to_string()),
+            id: self.id.unwrap_or_else(next_id),
             name: self.name,
             interactive: self.interactive.unwrap_or(false),
         })
@@ -174,23 +209,29 @@ impl TryInto<Command> for ConfigCommand {
 /// Configuration for a group of commands
 #[derive(Debug, Deserialize, Serialize)]
 pub struct ConfigCommandGroup {
+    #[serde(skip_serializing_if = "Option::is_none")]
     pub id: Option<String>,
     pub name: String,
+    #[serde(skip_serializing_if = "Option::is_none")]
     pub auto: Option<ConfigAuto>,
+    #[serde(skip_serializing_if = "Option::is_none")]
     pub cwd: Option<PathBuf>,
+    #[serde(skip_serializing_if = "Option::is_none")]
     pub commands: Option<Vec<ConfigCommand>>,
+    #[serde(skip_serializing_if = "Option::is_none")]
     pub children: Option<Vec<ConfigCommandGroup>>,
 }
 
-impl From<CommandGroup> for ConfigCommandGroup {
-    fn from(group: CommandGroup) -> Self {
+/// Borrowing conversion, so serializing a group doesn't require cloning the whole tree first
+impl From<&CommandGroup> for ConfigCommandGroup {
+    fn from(group: &CommandGroup) -> Self {
         ConfigCommandGroup {
-            id: Some(group.id),
-            name: group.name,
-            auto: Some(group.auto.into()),
-            cwd: Some(group.cwd),
-            commands: Some(group.commands.into_iter().map(Into::into).collect()),
-            children: Some(group.children.into_iter().map(Into::into).collect()),
+            id: Some(group.id.clone()),
+            name: group.name.clone(),
+            auto: Some((&group.auto).into()),
+            cwd: Some(group.cwd.clone()),
+            commands: Some(group.commands.iter().map(Into::into).collect()),
+            children: Some(group.children.iter().map(Into::into).collect()),
         }
     }
 }
@@ -212,7 +253,7 @@ impl TryInto<CommandGroup> for ConfigCommandGroup {
             .map(|c| c.try_into())
             .collect::<Result<Vec<Command>, ConfigError>>()?;
         Ok(CommandGroup {
-            id: self.id.unwrap_or_else(|| Uuid::new_v4().to_string()),
+            id: self.id.unwrap_or_else(next_id),
             name: self.name,
             auto: self.auto.unwrap_or_default().try_into()?,
             cwd: self.cwd.unwrap_or_default(),
@@ -230,9 +271,9 @@ impl ConfigCommandGroup {
 
 /// Root configuration structure for Fnug
 ///
-/// This struct basically "inherits" from `ConfigCommandGroup`, but making serde
-/// flatten the fields into the root config struct.
-///
+/// This struct basically "inherits" from `ConfigCommandGroup`. The group fields are spelled out
+/// instead of using `#[serde(flatten)]`, which would buffer the whole document into an
+/// intermediate map and deserialize the group from that in a second pass.
 ///
 /// # Example Configuration
 ///
@@ -251,8 +292,30 @@ impl ConfigCommandGroup {
 #[derive(Debug, Deserialize, Serialize)]
 pub struct Config {
     fnug_version: String,
-    #[serde(flatten)]
-    pub root: ConfigCommandGroup,
+    #[serde(skip_serializing_if = "Option::is_none")]
+    id: Option<String>,
+    name: String,
+    #[serde(skip_serializing_if = "Option::is_none")]
+    auto: Option<ConfigAuto>,
+    #[serde(skip_serializing_if = "Option::is_none")]
+    cwd: Option<PathBuf>,
+    #[serde(skip_serializing_if = "Option::is_none")]
+    commands: Option<Vec<ConfigCommand>>,
+    #[serde(skip_serializing_if = "Option::is_none")]
+    children: Option<Vec<ConfigCommandGroup>>,
+}
+
+impl From<Config> for ConfigCommandGroup {
+    fn from(config: Config) -> Self {
+        ConfigCommandGroup {
+            id: config.id,
+            name: config.name,
+            auto: config.auto,
+            cwd: config.cwd,
+            commands: config.commands,
+            children: config.children,
+        }
+    }
 }
 
 /// List of supported configuration file names
@@ -267,14 +330,27 @@ impl Config {
     ///
     /// # Errors
     ///
+    /// * `ConfigError::ConfigFileNotFound` if the file does not exist
     /// * `ConfigError::Io` if the file cannot be read
-    /// * `ConfigError::Serde` if the file contains invalid YAML/JSON
+    /// * `ConfigError::Serde` if the file contains invalid YAML
+    /// * `ConfigError::Json` if a `.json` file contains invalid JSON
     ///
     /// ```
     pub fn from_file(file: &PathBuf) -> Result<Config, ConfigError> {
-        let file =
-            std::fs::read_to_string(file).map_err(|_| ConfigError::ConfigNotFound(file.clone()))?;
-        let config: Config = serde_yaml::from_str(&file)?;
+        let contents = std::fs::read(file).map_err(|err| match err.kind() {
+            std::io::ErrorKind::NotFound => ConfigError::ConfigFileNotFound(file.clone()),
+            _ => ConfigError::Io {
+                path: file.clone(),
+                source: err,
+            },
+        })?;
+        // Hand the raw bytes to the parsers, they check the encoding while parsing, so there is no
+        // separate pass to decode the file into a `String` first
+        let config: Config = match file.extension().and_then(|ext| ext.to_str()) {
+            // JSON is valid YAML, but the dedicated JSON parser is a lot faster
+            Some("json") => serde_json::from_slice(&contents)?,
+            _ => serde_yaml::from_slice(&contents)?,
+        };
         Ok(config)
     }
 
@@ -286,7 +362,8 @@ impl Config {
     ///
     /// # Errors
     ///
-    /// * `ConfigError::Io` if no configuration file is found
+    /// * `ConfigError::ConfigNotFound` if no configuration file is found
+    /// * `ConfigError::Io` if a directory cannot be read
     ///
     /// ```
     pub fn find_config() -> Result<PathBuf, ConfigError> {
@@ -295,12 +372,28 @@ impl Config {
         let mut path = config_path.clone();
         debug!("Searching for config file in {:?}", config_path);
         loop {
-            for file in &FILENAMES {
-                let config_path = path.join(file);
-                if config_path.exists() {
-                    info!("Found config file: {:?}", config_path);
-                    return Ok(config_path);
+            // List each directory once, instead of probing every candidate name separately
+            let entries: HashSet<OsString> = match std::fs::read_dir(&path) {
+                Ok(entries) => entries
+                    .filter_map(Result::ok)
+                    .map(|entry| entry.file_name())
+                    .collect(),
+                // A missing directory has no config file, but don't skip one that can't be read
+                Err(err) if err.kind() == std::io::ErrorKind::NotFound => HashSet::new(),
+                Err(err) => {
+                    return Err(ConfigError::Io {
+                        path: path.clone(),
+                        source: err,
+                    })
                 }
+            };
+            if let Some(file) = FILENAMES
+                .iter()
+                .find(|file| entries.contains(OsStr::new(file)))
+            {
+                let config_path = path.join(file);
+                info!("Found config file: {:?}", config_path);
+                return Ok(config_path);
             }
             if !path.pop() {
                 return Err(ConfigError::ConfigNotFound(config_path));
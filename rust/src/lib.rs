@@ -11,8 +11,9 @@ use commands::auto::Auto;
 use commands::command::Command;
 use commands::group::CommandGroup;
 use commands::inherit::Inheritable;
-use config_file::Config;
+use config_file::{Config, ConfigCommandGroup, ConfigError};
 use log::{debug, LevelFilter};
+use pyo3::sync::GILOnceCell;
 use pyo3::{exceptions::PyFileNotFoundError, prelude::*};
 use pyo3_log::{Caching, Logger};
 use selectors::get_selected_commands;
@@ -24,6 +25,22 @@ pub mod pty;
 mod selectors;
 mod ui;
 
+/// `pathlib.Path`, looked up once instead of on every `FnugCore.cwd` access
+static PATHLIB_PATH: GILOnceCell<PyObject> = GILOnceCell::new();
+
+/// Compiles the git patterns of every git-enabled command once, instead of on every selection
+fn compile_git_patterns(config: &mut CommandGroup) -> Result<(), ConfigError> {
+    for command in config.all_commands_mut() {
+        if command.auto.git.unwrap_or(false) {
+            command
+                .auto
+                .compile_regex_set()
+                .map_err(ConfigError::Regex)?;
+        }
+    }
+    Ok(())
+}
+
 #[cfg_attr(feature = "stub_gen", pyo3_stub_gen::derive::gen_stub_pyclass)]
 #[pyclass]
 struct FnugCore {
@@ -49,6 +66,7 @@ impl FnugCore {
 
         let mut command_group = command_group;
         command_group.inherit(&Inheritance::from(cwd.clone()))?;
+        compile_git_patterns(&mut command_group)?;
 
         Ok(FnugCore {
             config: command_group,
@@ -63,7 +81,8 @@ impl FnugCore {
     ///
     /// # Errors
     ///
-    /// - Raises `PyFileNotFoundError` if the config file doesn't exist or can't be read
+    /// - Raises `PyFileNotFoundError` if the config file doesn't exist
+    /// - Raises `PyOSError` if the config file can't be read
     /// - Raises `PyValueError` if the config file contains invalid YAML/JSON
     ///
     /// # Examples
@@ -79,15 +98,13 @@ impl FnugCore {
     #[pyo3(signature = (config_file=None))]
     fn from_config_file(config_file: Option<&str>) -> PyResult<Self> {
         let config_path = match config_file {
-            Some(file) => {
-                let config_path = PathBuf::from(file);
-                if !config_path.exists() {
-                    return Err(PyFileNotFoundError::new_err("Config file not found"));
+            // No need to probe the file first, `Config::from_file` reports a missing file itself
+            Some(file) => PathBuf::from(file),
+            None => Config::find_config().map_err(|err| match err {
+                ConfigError::ConfigNotFound(_) => {
+                    PyFileNotFoundError::new_err(format!("Error finding config file: {:?}", err))
                 }
-                config_path
-            }
-            None => Config::find_config().map_err(|err| {
-                PyFileNotFoundError::new_err(format!("Error finding config file: {:?}", err))
+                err => PyErr::from(err),
             })?,
         };
         let cwd = config_path.parent().unwrap().to_path_buf();
@@ -95,9 +112,11 @@ impl FnugCore {
             "Creating core from config file: {:?} (cwd: {:?})",
             config_path, cwd
         );
-        let mut config: CommandGroup = Config::from_file(&config_path)?.root.try_into()?;
+        let root: ConfigCommandGroup = Config::from_file(&config_path)?.into();
+        let mut config: CommandGroup = root.try_into()?;
 
         config.inherit(&Inheritance::from(cwd.clone()))?;
+        compile_git_patterns(&mut config)?;
 
         Ok(FnugCore { config, cwd })
     }
@@ -105,11 +124,11 @@ impl FnugCore {
     /// Returns the working directory as a Python pathlib.Path object
     #[getter]
     fn get_cwd(&self, py: Python<'_>) -> PyResult<PyObject> {
-        let pathlib = py.import("pathlib")?;
-        let path = pathlib.getattr("Path")?;
-        let obj = path.call1((self.cwd.to_string_lossy(),))?;
-        let resolved = obj.call_method0("resolve")?;
-        Ok(resolved.into())
+        let path = PATHLIB_PATH.get_or_try_init(py, || -> PyResult<PyObject> {
+            Ok(py.import("pathlib")?.getattr("Path")?.unbind())
+        })?;
+        let obj = path.call1(py, (self.cwd.to_string_lossy(),))?;
+        obj.call_method0(py, "resolve")
     }
 
     /// Returns a list of all commands in the configuration
@@ -125,9 +144,12 @@ impl FnugCore {
     }
 
     /// Returns commands that have detected git changes in their watched paths, or have `always=True`
-    fn selected_commands(&self) -> PyResult<Vec<Command>> {
-        let commands = self.config.all_commands().into_iter().cloned().collect();
-        Ok(get_selected_commands(commands)?)
+    fn selected_commands(&self, py: Python<'_>) -> PyResult<Vec<Command>> {
+        // Scanning the repositories can take a while, so let other Python threads run meanwhile
+        py.allow_threads(|| {
+            let commands = self.config.all_commands().into_iter().cloned().collect();
+            Ok(get_selected_commands(commands)?)
+        })
     }
 }
 
@@ -1,41 +1,38 @@
 use anstyle::{AnsiColor, Reset, RgbColor, Style};
+use std::sync::LazyLock;
 
 const PRIMARY_COLOR: Style =
     Style::new().fg_color(Some(anstyle::Color::Rgb(RgbColor(207, 106, 76))));
 const SUCCESS_COLOR: Style = Style::new().fg_color(Some(anstyle::Color::Ansi(AnsiColor::Green)));
 const ERROR_COLOR: Style = Style::new().fg_color(Some(anstyle::Color::Ansi(AnsiColor::Red)));
 
-fn render_arrow() -> String {
-    format!("{}❱{}", PRIMARY_COLOR, Reset)
-}
+// The styled markers are rendered to escape sequences once, so formatting a message only copies
+// them into a single buffer instead of rendering every style again
 
-fn render_success() -> String {
-    format!("{}✓{}", SUCCESS_COLOR, Reset)
-}
-
-fn render_error() -> String {
-    format!("{}✘{}", ERROR_COLOR, Reset)
-}
+static PROMPT: LazyLock<String> = LazyLock::new(|| format!("{PRIMARY_COLOR}❱{Reset}"));
+static FAILURE_MARKER: LazyLock<String> = LazyLock::new(|| format!("{ERROR_COLOR}✘{Reset}"));
 
 pub fn format_start_message(command: &String) -> Vec<u8> {
-    format!("{} {}\r\n\r\n", render_arrow(), command).into()
+    format!("{} {command}\r\n\r\n", *PROMPT).into()
 }
 
-pub fn format_success_message() -> Vec<u8> {
+/// The success message never changes, so it is only rendered once
+static SUCCESS_MESSAGE: LazyLock<Vec<u8>> = LazyLock::new(|| {
     format!(
-        "\r\n{} Command succeeded {}\r\n",
-        render_arrow(),
-        render_success()
+        "\r\n{} Command succeeded {SUCCESS_COLOR}✓{Reset}\r\n",
+        *PROMPT
     )
     .into()
+});
+
+pub fn format_success_message() -> &'static [u8] {
+    &SUCCESS_MESSAGE
 }
 
 pub fn format_failure_message(exit_code: u32) -> Vec<u8> {
     format!(
-        "\r\n{} Command failed {} (exit code {})\r\n",
-        render_arrow(),
-        render_error(),
-        exit_code
+        "\r\n{} Command failed {} (exit code {exit_code})\r\n",
+        *PROMPT, *FAILURE_MARKER
     )
     .into()
 }
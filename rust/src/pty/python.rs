@@ -4,6 +4,7 @@ use crate::pty::terminal::{ProcessError, Terminal, TerminalSize};
 use log::{debug, error};
 use pyo3::exceptions::{PyStopAsyncIteration, PyValueError};
 use pyo3::{pyclass, pymethods, Bound, Py, PyAny, PyRef, PyResult, Python};
+use std::sync::atomic::{AtomicBool, Ordering};
 use std::sync::Arc;
 use tokio::sync::{watch, Mutex};
 
@@ -21,29 +22,40 @@ pub struct Output {
 #[cfg_attr(feature = "stub_gen", pyo3_stub_gen::derive::gen_stub_pyclass)]
 #[pyclass]
 pub struct OutputIterator {
-    rx: Arc<Mutex<watch::Receiver<Output>>>,
+    rx: Arc<Mutex<watch::Receiver<()>>>,
+    terminal: Arc<Terminal>,
+    /// Set when iteration starts, so the first output is the current screen without waiting
+    initial: AtomicBool,
 }
 
 #[cfg_attr(feature = "stub_gen", pyo3_stub_gen::derive::gen_stub_pymethods)]
 #[pymethods]
 impl OutputIterator {
     fn __aiter__(slf: PyRef<Self>) -> PyRef<Self> {
-        if let Ok(mut rx) = slf.rx.try_lock() {
-            rx.mark_changed();
-        }
+        // A flag, not mark_changed, as a previous iteration may still hold the receiver lock
+        slf.initial.store(true, Ordering::Release);
         slf
     }
 
     fn __anext__<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyAny>> {
         let rx = self.rx.clone();
+        let terminal = self.terminal.clone();
+        let initial = self.initial.swap(false, Ordering::AcqRel);
         let promise = py.allow_threads(|| async move {
-            let mut rx = rx.lock().await;
-            rx.changed().await.map_err(|e| {
-                error!("Error receiving output: {:?}", e);
-                PyStopAsyncIteration::new_err("End of output")
-            })?;
-            let data = rx.borrow_and_update().clone();
-            Ok(data)
+            if initial {
+                // The snapshot already includes any pending change, so don't deliver it twice
+                if let Ok(mut rx) = rx.try_lock() {
+                    rx.mark_unchanged();
+                }
+            } else {
+                let mut rx = rx.lock().await;
+                rx.changed().await.map_err(|e| {
+                    error!("Error receiving output: {:?}", e);
+                    PyStopAsyncIteration::new_err("End of output")
+                })?;
+                rx.mark_unchanged();
+            }
+            Ok(terminal.snapshot())
         });
 
         pyo3_async_runtimes::tokio::future_into_py(py, promise)
@@ -66,7 +78,7 @@ impl Process {
     #[new]
     fn new(command: Command, width: u16, height: u16, py: Python<'_>) -> PyResult<Self> {
         debug!("Creating new process: {:?}", command);
-        let (output_tx, output_rx) = watch::channel(Output::default());
+        let (output_tx, output_rx) = watch::channel(());
 
         let start_message = format_start_message(&command.cmd);
         let term_cmd = &command;
@@ -75,15 +87,18 @@ impl Process {
                 .map_err(|e| PyValueError::new_err(format!("Terminal setup failed: {:?}", e)))
         })?;
         terminal.echo(start_message).unwrap();
+        let terminal = Arc::new(terminal);
 
         Ok(Self {
-            terminal: Arc::new(terminal),
             output: Py::new(
                 py,
                 OutputIterator {
                     rx: Arc::new(Mutex::new(output_rx)),
+                    terminal: Arc::clone(&terminal),
+                    initial: AtomicBool::new(true),
                 },
             )?,
+            terminal,
             command,
         })
     }
@@ -5,6 +5,7 @@ use parking_lot::Mutex;
 use portable_pty::{
     native_pty_system, Child, ChildKiller, CommandBuilder, ExitStatus, MasterPty, PtySize,
 };
+use std::borrow::Cow;
 use std::fmt::Debug;
 use std::io::{Read, Write};
 use std::sync::Arc;
@@ -12,6 +13,10 @@ use std::thread::spawn;
 use tokio::sync::watch;
 
 const SCROLLBACK_SIZE: usize = 3500;
+/// Size of the buffer used to read from the PTY, large enough to take bursts of output in one read
+const READ_BUFFER_SIZE: usize = 8192;
+/// The most queued updates applied in one go, so continuous output can't hold the parser lock forever
+const MAX_COALESCED_UPDATES: usize = 64;
 
 #[derive(Debug, thiserror::Error)]
 pub enum ProcessError {
@@ -69,12 +74,11 @@ fn spawn_pty(
     Ok((child, pair.master))
 }
 
-#[allow(clippy::large_enum_variant)]
 #[derive(Debug)]
 enum TerminalUpdate {
-    Process([u8; 1024]),
+    Process(Vec<u8>),
     Resize(TerminalSize),
-    Echo(Vec<u8>),
+    Echo(Cow<'static, [u8]>),
     Scroll(isize),
     SetScroll(usize),
     Clear,
@@ -85,7 +89,12 @@ impl From<&vt100::Screen> for Output {
         let width = screen.size().1;
         let contents = screen
             .rows_formatted(0, width)
-            .map(|r| String::from_utf8_lossy(&r).to_string())
+            // Rows are almost always valid UTF-8, in which case the buffer is reused as-is rather
+            // than copied into a new string
+            .map(|r| {
+                String::from_utf8(r)
+                    .unwrap_or_else(|e| String::from_utf8_lossy(e.as_bytes()).into_owned())
+            })
             .collect::<Vec<String>>();
 
         Self {
@@ -96,48 +105,71 @@ impl From<&vt100::Screen> for Output {
     }
 }
 
-/// Spawn a thread to process terminal output and send it to the output channel
+/// Apply a single update to the terminal parser
+///
+/// Returns whether the screen may have changed, scrolling without moving doesn't need a redraw
+fn apply_update(parser: &mut vt100::Parser, update: TerminalUpdate) -> bool {
+    match update {
+        TerminalUpdate::Process(bytes) => {
+            parser.process(&bytes);
+        }
+        TerminalUpdate::Resize(size) => {
+            parser.set_size(size.rows, size.cols);
+        }
+        TerminalUpdate::Scroll(delta) => {
+            let pos = parser.screen().scrollback();
+            let new_pos = pos.saturating_add_signed(-delta);
+
+            if pos == new_pos {
+                return false;
+            }
+            parser.set_scrollback(new_pos);
+        }
+        TerminalUpdate::SetScroll(rows) => {
+            let pos = parser.screen().scrollback();
+            parser.set_scrollback(rows);
+            return parser.screen().scrollback() != pos;
+        }
+        TerminalUpdate::Echo(text) => {
+            parser.process(&text);
+        }
+        TerminalUpdate::Clear => {
+            parser.clear();
+        }
+    }
+    true
+}
+
+/// Spawn a thread to process terminal output and notify the output channel when the screen changed
 fn spawn_output_writer(
     parser: Arc<Mutex<vt100::Parser>>,
-    out_chan: watch::Sender<Output>,
+    out_chan: watch::Sender<()>,
 ) -> Result<crossbeam_channel::Sender<TerminalUpdate>, ProcessError> {
     let (terminal_tx, terminal_rx) = crossbeam_channel::bounded(1000);
 
     spawn(move || loop {
-        let res = terminal_rx.recv();
-        let mut parser = parser.lock();
-        match res {
-            Ok(TerminalUpdate::Process(bytes)) => {
-                parser.process(&bytes);
-            }
-            Ok(TerminalUpdate::Resize(size)) => {
-                parser.set_size(size.rows, size.cols);
-            }
-            Ok(TerminalUpdate::Scroll(delta)) => {
-                let pos = parser.screen().scrollback();
-                let new_pos = pos.saturating_add_signed(-delta);
-
-                if pos != new_pos {
-                    parser.set_scrollback(new_pos);
-                }
-            }
-            Ok(TerminalUpdate::SetScroll(rows)) => {
-                parser.set_scrollback(rows);
-            }
-            Ok(TerminalUpdate::Echo(text)) => {
-                parser.process(text.as_slice());
-            }
-            Ok(TerminalUpdate::Clear) => {
-                parser.clear();
-            }
+        let update = match terminal_rx.recv() {
+            Ok(update) => update,
             Err(e) => {
                 error!("Terminal update error: {:?}", e);
                 break;
             }
+        };
+        let mut parser = parser.lock();
+        let mut changed = apply_update(&mut parser, update);
+        // Apply everything that queued up in the meantime as well, so a burst of output results
+        // in a single screen snapshot instead of one per read. The drain is capped, so a process that
+        // never stops writing still releases the lock for snapshots and notifies the output channel
+        for update in terminal_rx.try_iter().take(MAX_COALESCED_UPDATES) {
+            changed |= apply_update(&mut parser, update);
         }
+        drop(parser);
 
-        // Send to output channel
-        out_chan.send_replace(parser.screen().into());
+        // Only notify the output channel, the screen snapshot is taken when it is actually read, so
+        // terminals that are not displayed never pay for it
+        if changed {
+            out_chan.send_replace(());
+        }
     });
 
     Ok(terminal_tx)
@@ -154,15 +186,18 @@ fn spawn_pty_reader(
     let (status_tx, status_rx) = crossbeam_channel::bounded(1);
 
     spawn(move || {
+        let mut buf = [0u8; READ_BUFFER_SIZE];
         loop {
-            let mut buf = [0u8; 1024];
             match reader.read(&mut buf) {
                 Ok(0) => {
                     debug!("PTY reader EOF");
                     break;
                 }
-                Ok(_) => {
-                    terminal_tx.send(TerminalUpdate::Process(buf)).unwrap();
+                Ok(n) => {
+                    // Only pass on the bytes that were read, not the unused tail of the buffer
+                    terminal_tx
+                        .send(TerminalUpdate::Process(buf[..n].to_vec()))
+                        .unwrap();
                 }
                 Err(e) => {
                     error!("PTY reader thread error: {:?}", e);
@@ -179,6 +214,16 @@ fn spawn_pty_reader(
     Ok(status_rx)
 }
 
+/// Encode a left click at the zero-based cell `x`, `y` as an SGR mouse press and release
+///
+/// Both are formatted into a single buffer, as `write!` on the unbuffered pty writer issues a
+/// separate write for every formatted fragment
+fn mouse_click_sequence(x: u16, y: u16) -> Vec<u8> {
+    // SGR mouse coordinates are one-based
+    let (x, y) = (x + 1, y + 1);
+    format!("\x1b[<0;{x};{y}M\x1b[<0;{x};{y}m").into_bytes()
+}
+
 fn spawn_pty_writer(
     mut writer: Box<dyn Write + Send>,
     master: Box<dyn MasterPty + Send>,
@@ -186,27 +231,44 @@ fn spawn_pty_writer(
 ) -> crossbeam_channel::Sender<PtyUpdate> {
     let (pty_tx, pty_rx) = crossbeam_channel::bounded(1000);
 
-    spawn(move || loop {
-        match pty_rx.recv() {
-            Ok(PtyUpdate::MouseClick(x, y)) => {
-                write!(writer, "\x1b[<0;{};{}M", x + 1, y + 1).unwrap();
-                write!(writer, "\x1b[<0;{};{}m", x + 1, y + 1).unwrap();
-            }
-            Ok(PtyUpdate::Resize(size)) => {
-                master.resize(size.into()).unwrap();
-            }
-            Ok(PtyUpdate::Write(input)) => {
-                writer.write_all(&input).unwrap();
-            }
-            Ok(PtyUpdate::KillProcess) => {
-                debug!("Killing process");
-                killer
-                    .kill()
-                    .unwrap_or_else(|e| debug!("Failed to kill process: {:?}", e));
-            }
-            Err(_) => {
-                debug!("PTY writer thread EOF");
-                break;
+    spawn(move || {
+        // An update that was received while merging writes, and still has to be handled
+        let mut pending = None;
+        loop {
+            let update = match pending.take().map_or_else(|| pty_rx.recv(), Ok) {
+                Ok(update) => update,
+                Err(_) => {
+                    debug!("PTY writer thread EOF");
+                    break;
+                }
+            };
+            match update {
+                PtyUpdate::MouseClick(x, y) => {
+                    writer.write_all(&mouse_click_sequence(x, y)).unwrap();
+                }
+                PtyUpdate::Resize(size) => {
+                    master.resize(size.into()).unwrap();
+                }
+                PtyUpdate::Write(mut input) => {
+                    // Merge input that queued up in the meantime, eg. a paste or fast typing, so
+                    // it is written in a single call
+                    while let Ok(update) = pty_rx.try_recv() {
+                        match update {
+                            PtyUpdate::Write(more) => input.extend(more),
+                            other => {
+                                pending = Some(other);
+                                break;
+                            }
+                        }
+                    }
+                    writer.write_all(&input).unwrap();
+                }
+                PtyUpdate::KillProcess => {
+                    debug!("Killing process");
+                    killer
+                        .kill()
+                        .unwrap_or_else(|e| debug!("Failed to kill process: {:?}", e));
+                }
             }
         }
     });
@@ -233,7 +295,7 @@ impl Terminal {
     pub fn new(
         command: &Command,
         size: TerminalSize,
-        out_chan: watch::Sender<Output>,
+        out_chan: watch::Sender<()>,
     ) -> Result<Self, ProcessError> {
         let (process, master) = spawn_pty(command, size.clone())?;
         let reader = master.try_clone_reader().unwrap();
@@ -293,6 +355,11 @@ impl Terminal {
             .map_err(|_| ProcessError::UpdateChannelDisconnected)
     }
 
+    /// Take a snapshot of the current screen
+    pub fn snapshot(&self) -> Output {
+        self.parser.lock().screen().into()
+    }
+
     /// Send a mouse click event to the terminal
     ///
     /// Returns an error if the writer channel is disconnected, which usually means the process has
@@ -325,9 +392,11 @@ impl Terminal {
     }
 
     /// Write text to the terminal
-    pub fn echo(&self, text: Vec<u8>) -> Result<(), ProcessError> {
+    ///
+    /// Accepts both owned and static text, so fixed messages can be echoed without copying them
+    pub fn echo(&self, text: impl Into<Cow<'static, [u8]>>) -> Result<(), ProcessError> {
         self.terminal_tx
-            .send(TerminalUpdate::Echo(text))
+            .send(TerminalUpdate::Echo(text.into()))
             .map_err(|_| ProcessError::UpdateChannelDisconnected)
     }
 
@@ -345,3 +414,16 @@ impl Terminal {
             .map_err(|_| ProcessError::WriterDisconnected)
     }
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_mouse_click_sequence() {
+        assert_eq!(
+            mouse_click_sequence(0, 9),
+            b"\x1b[<0;1;10M\x1b[<0;1;10m".to_vec()
+        );
+    }
+}
@@ -1,70 +1,86 @@
 use crate::commands::command::Command;
 use crate::selectors::{RunnableSelector, SelectorError};
-use git2::Repository;
-use regex_cache::LazyRegex;
+use git2::{Repository, StatusOptions};
+use parking_lot::Mutex;
+use regex::RegexSet;
 use std::collections::HashMap;
 use std::path::{Path, PathBuf};
+use std::sync::LazyLock;
+
+/// Maps watched paths to the root of the repository they belong to
+///
+/// Discovering a repository walks up the file system, and the answer rarely changes while fnug is
+/// running, so it is shared between selections instead of being redone every time. The keys are
+/// the auto paths from the config, so the cache can't grow past the size of the config.
+static REPOSITORY_CACHE: LazyLock<Mutex<HashMap<PathBuf, PathBuf>>> =
+    LazyLock::new(Default::default);
 
 #[derive(Default)]
 struct GitScanner {
-    repository_cache: HashMap<PathBuf, PathBuf>,
     repo_changes_cache: HashMap<PathBuf, Vec<PathBuf>>,
 }
 
 impl GitScanner {
     fn get_repo(&mut self, path: &PathBuf) -> Result<PathBuf, git2::Error> {
-        if let Some(cached_path) = self.repository_cache.get(path).cloned() {
+        // Release the lock before the else branch, which takes it again
+        let cached_path = REPOSITORY_CACHE.lock().get(path).cloned();
+        // A single stat is enough to notice that the repository has been removed since it was
+        // cached, in which case it is discovered again
+        if let Some(cached_path) = cached_path.filter(|repo| repo.join(".git").exists()) {
             Ok(cached_path)
         } else {
             let repo_path = Repository::discover_path(path, &[] as &[&Path])?;
             // This is the .git directory, we want the parent directory
             let repo_path = repo_path.parent().unwrap().to_path_buf();
-            self.repository_cache
+            REPOSITORY_CACHE
+                .lock()
                 .insert(path.clone(), repo_path.clone());
             Ok(repo_path)
         }
     }
 
-    fn get_changes(&mut self, repo: &PathBuf) -> Result<Vec<PathBuf>, git2::Error> {
-        if let Some(cached_changes) = self.repo_changes_cache.get(repo).cloned() {
-            Ok(cached_changes)
-        } else {
+    fn get_changes(&mut self, repo: &PathBuf) -> Result<&[PathBuf], git2::Error> {
+        if !self.repo_changes_cache.contains_key(repo) {
+            // Without options libgit2 also reports ignored files, which means walking every ignored
+            // directory (build output, virtualenvs, ...) only for us to discard the results
+            let mut options = StatusOptions::new();
+            options
+                .include_untracked(true)
+                .recurse_untracked_dirs(true)
+                .include_ignored(false);
             let changes = Repository::open(repo)?
-                .statuses(None)?
+                .statuses(Some(&mut options))?
                 .iter()
-                .filter(|entry| !entry.status().is_ignored())
                 .map(|status| {
                     let path = status.path().unwrap();
                     Ok(PathBuf::from(path))
                 })
                 .collect::<Result<Vec<PathBuf>, git2::Error>>()?;
-            self.repo_changes_cache
-                .insert(repo.clone(), changes.clone());
-            Ok(changes)
+            self.repo_changes_cache.insert(repo.clone(), changes);
         }
+        Ok(&self.repo_changes_cache[repo])
     }
 
-    fn has_changes(
-        &mut self,
-        path: &PathBuf,
-        patterns: Vec<LazyRegex>,
-    ) -> Result<bool, git2::Error> {
+    fn has_changes(&mut self, path: &PathBuf, patterns: &RegexSet) -> Result<bool, git2::Error> {
         let repo = self.get_repo(path)?;
+        // Changes are relative to the repository root, so compare them to the watched path relative
+        // to the root, instead of building the absolute path of every change in the repository
+        let Ok(sub_path) = path.strip_prefix(&repo) else {
+            return Ok(false);
+        };
         let changes = self.get_changes(&repo)?;
 
-        let changes = changes
+        // Only the existence of a match matters, so stop at the first one
+        let has_changes = changes
             .iter()
+            // Remove any changes that are not in the watched path
+            .filter(|change| change.starts_with(sub_path))
             // Get the absolute path of the change
             .map(|change| repo.join(change))
-            // Remove any changes that are not in the watched path
-            .filter(|change| change.starts_with(path))
-            // Convert to string
-            .map(|change| change.to_string_lossy().to_string())
-            // Remove any changes that do not match the regex
-            .filter(|change| patterns.iter().any(|pattern| pattern.is_match(change)))
-            .collect::<Vec<String>>();
+            // Look for a change that matches the regex
+            .any(|change| patterns.is_match(&change.to_string_lossy()));
 
-        Ok(!changes.is_empty())
+        Ok(has_changes)
     }
 }
 
@@ -81,10 +97,13 @@ impl RunnableSelector for GitSelector {
 
         for command in commands {
             if command.auto.git.unwrap_or(false) {
+                // Match every change against all the patterns in a single pass, rather than
+                // running each regex separately
+                let patterns = command.auto.regex_set()?;
                 let has_git_changes = command.auto.path.iter().try_fold(
                     false,
                     |acc, path| -> Result<bool, SelectorError> {
-                        Ok(acc || git_scanner.has_changes(path, command.auto.regex.clone())?)
+                        Ok(acc || git_scanner.has_changes(path, &patterns)?)
                     },
                 )?;
 
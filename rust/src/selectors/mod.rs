@@ -13,6 +13,9 @@ pub enum SelectorError {
     /// Indicates a general git operation error
     #[error("Git operation failed: {0}")]
     Git(#[from] git2::Error),
+    /// Indicates that the auto regexes could not be combined
+    #[error("Invalid regex: {0}")]
+    Regex(#[from] regex::Error),
 }
 
 impl From<SelectorError> for PyErr {
@@ -21,6 +24,7 @@ impl From<SelectorError> for PyErr {
             SelectorError::Git(err) => {
                 PyValueError::new_err(format!("Error running git command: {:?}", err))
             }
+            SelectorError::Regex(err) => PyValueError::new_err(format!("Invalid regex: {:?}", err)),
         }
     }
 }
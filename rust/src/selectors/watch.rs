@@ -26,15 +26,12 @@ fn commands_for_paths<'a>(
 ) -> Vec<&'a Command> {
     let mut commands = Vec::new();
     for path in paths {
+        // Convert the changed path once, instead of once per regex of every candidate command
+        let path_str = path.to_string_lossy();
         for (key, value) in path_map {
             if path.starts_with(key) {
                 for cmd in value {
-                    if cmd
-                        .auto
-                        .regex
-                        .iter()
-                        .any(|re| re.is_match(path.to_str().unwrap()))
-                    {
+                    if cmd.auto.regex.iter().any(|re| re.is_match(&path_str)) {
                         commands.push(cmd);
                     }
                 }
@@ -187,6 +184,7 @@ mod tests {
                     .collect(),
                 git: None,
                 always: None,
+                regex_set: None,
             },
         }
     }
@@ -1,8 +1,20 @@
-from fnug.cli import cli
+import sys
 
 
 def main():
     """Call the CLI entrypoint."""
+    if len(sys.argv) == 1:
+        # A bare `fnug` is the common case, start the app directly without building the click CLI
+        from fnug.logging import setup_logging
+        from fnug.ui.app import start_app
+
+        # Same as the `cli` group callback followed by `fnug run`
+        setup_logging()
+        start_app()
+        return
+
+    from fnug.cli import cli
+
     cli()
 
 
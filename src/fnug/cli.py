@@ -1,9 +1,7 @@
 import click
 from click_default_group import DefaultGroup
 
-from fnug.core import FnugCore
 from fnug.logging import LogLevel, get_logger, log_level_callback, setup_logging
-from fnug.ui.app import FnugApp
 
 DEFAULT_FILE_NAMES = [".fnug.json", ".fnug.yaml", ".fnug.yml"]
 
@@ -37,11 +35,16 @@ def cli() -> None:
 @click.option("--config", "-c", type=click.Path(), help="Config file")
 def run(config: str | None = None) -> None:
     """Run the fnug application."""
-    FnugApp.from_config_file(config).run()
+    # Textual is only needed for the TUI, don't pay for importing it in the other subcommands
+    from fnug.ui.app import start_app
+
+    start_app(config)
 
 
 @cli.command()  # pyright: ignore reportUnknownMemberType
 @click.option("--config", "-c", type=click.Path(), help="Config file")
 def config(config: str | None = None) -> None:
     """Print the current configuration."""
+    from fnug.core import FnugCore
+
     click.echo(FnugCore.from_config_file(config).config.as_yaml())
@@ -115,7 +115,8 @@ class FnugCore:
         
         # Errors
         
-        - Raises `PyFileNotFoundError` if the config file doesn't exist or can't be read
+        - Raises `PyFileNotFoundError` if the config file doesn't exist
+        - Raises `PyOSError` if the config file can't be read
         - Raises `PyValueError` if the config file contains invalid YAML/JSON
         
         # Examples
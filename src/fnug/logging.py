@@ -1,27 +1,33 @@
 import logging
 import os
-from collections.abc import Callable
-from datetime import datetime
+import sys
+import time
 from enum import IntEnum
+from functools import lru_cache
 from inspect import Traceback
 from typing import TYPE_CHECKING, Any, Optional
 
 import click
-from textual._context import active_app
-from textual._log import LogGroup, LogVerbosity
 
 if TYPE_CHECKING:
     from textual_dev.client import DevtoolsClient
 
-LEVEL_COLORS: dict[str, Callable[[str], str]] = {
-    "DEBUG": lambda x: click.style(x, fg="blue"),
-    "INFO": lambda x: click.style(x, fg="green"),
-    "WARNING": lambda x: click.style(x, fg="yellow"),
-    "ERROR": lambda x: click.style(x, fg="red"),
-    "CRITICAL": lambda x: click.style(x, fg="bright_red", bold=True),
+# Padded and colored once up front, as there are only a handful of level names
+LEVEL_COLORS: dict[str, str] = {
+    "DEBUG": click.style(f"{'DEBUG':<8}", fg="blue"),
+    "INFO": click.style(f"{'INFO':<8}", fg="green"),
+    "WARNING": click.style(f"{'WARNING':<8}", fg="yellow"),
+    "ERROR": click.style(f"{'ERROR':<8}", fg="red"),
+    "CRITICAL": click.style(f"{'CRITICAL':<8}", fg="bright_red", bold=True),
 }
 
 
+@lru_cache(maxsize=64)
+def _style_logger_name(name: str) -> str:
+    """Dim a logger name, the same few logger names are used over and over."""
+    return click.style(name, dim=True)
+
+
 class LogHandler(logging.Handler):
     """A Logging handler usable in both Textual and non-Textual environments."""
 
@@ -32,9 +38,14 @@ class LogHandler(logging.Handler):
 
     def _textual_devtools(self) -> Optional["DevtoolsClient"]:
         if not self._devtools:
-            try:
-                app = active_app.get()
-            except LookupError:
+            # Textual is only imported by the TUI, without it there is no app to log to, so don't import it here
+            if "textual._context" not in sys.modules:
+                return None
+            from textual._context import active_app
+
+            # Outside of a running app this path is taken for every record, so avoid raising and catching a LookupError
+            app = active_app.get(None)
+            if app is None:
                 return None
             self._devtools = app.devtools
 
@@ -51,6 +62,7 @@ class LogHandler(logging.Handler):
             self._stderr_handler(record)
 
     def _textual_handler(self, record: logging.LogRecord, devtools: "DevtoolsClient") -> None:
+        from textual._log import LogGroup, LogVerbosity
         from textual_dev.client import DevtoolsLog
 
         terminal_width = devtools.console.width
@@ -75,14 +87,14 @@ class LogHandler(logging.Handler):
         level_name = record.levelname
         message = record.msg
 
-        # Format timestamp
-        timestamp = datetime.fromtimestamp(record.created).strftime("%H:%M:%S.%f")[:-3]
+        # Format timestamp, the milliseconds are already computed by the logging module
+        timestamp = f"{time.strftime('%H:%M:%S', time.localtime(record.created))}.{int(record.msecs):03d}"
 
         # Color the level name
-        colored_level = LEVEL_COLORS.get(level_name, lambda x: x)(f"{level_name:<8}")
+        colored_level = LEVEL_COLORS.get(level_name) or f"{level_name:<8}"
 
         # Add the name of the logger
-        logger_name = click.style(record.name or "", dim=True)
+        logger_name = _style_logger_name(record.name or "")
 
         # Format the complete message
         formatted_message = f"{timestamp} {colored_level} {logger_name} {message}"
@@ -1,7 +1,9 @@
-from collections.abc import Callable
+import sys
+from collections.abc import Callable, Mapping
 from dataclasses import dataclass
 from functools import partial
 from pathlib import Path
+from types import MappingProxyType
 from typing import ClassVar
 
 from textual import events, on
@@ -9,32 +11,99 @@ from textual.app import App, ComposeResult
 from textual.binding import Binding, BindingType
 from textual.command import Hit, Hits, Provider
 from textual.containers import Horizontal
+from textual.timer import Timer
 from textual.widgets import Footer
 from textual.widgets._tree import TreeNode
 from textual.worker import Worker
 
 from fnug.core import CommandGroup, FnugCore, Process
-from fnug.ui.components.context_menu import ContextMenu
+from fnug.ui.components.context_menu import ContextMenu, menu_width
 from fnug.ui.components.lint_tree import (
     LintTree,
     LintTreeDataType,
     all_commands,
-    sum_selected_commands,
+    sum_commands,
     toggle_select_node,
     update_node,
 )
 from fnug.ui.components.terminal import Terminal
 
+# Delay before the highlighted command is displayed, so moving quickly through the tree only attaches the last one
+SWITCH_TERMINAL_DELAY = 0.05
+
+# Context menu options of a command, by its status. They never change, so they are shared instead of rebuilt per menu
+RUNNING_COMMAND_MENU: Mapping[str, str] = MappingProxyType(
+    {
+        "restart": "Restart",
+        "stop": "Stop",
+        "stop-clear": "Stop and clear",
+    }
+)
+FINISHED_COMMAND_MENU: Mapping[str, str] = MappingProxyType(
+    {
+        "run": "Re-run",
+        "clear": "Clear",
+    }
+)
+PENDING_COMMAND_MENU: Mapping[str, str] = MappingProxyType(
+    {
+        "run": "Run",
+    }
+)
+RUNNING_COMMAND_MENU_WIDTH = menu_width(RUNNING_COMMAND_MENU)
+FINISHED_COMMAND_MENU_WIDTH = menu_width(FINISHED_COMMAND_MENU)
+PENDING_COMMAND_MENU_WIDTH = menu_width(PENDING_COMMAND_MENU)
+
+try:
+    import uvloop
+except ImportError:  # uvloop is optional, and not available on Windows
+    uvloop = None
+
+
+def run_app(app: "FnugApp") -> None:
+    """
+    Run the app, on uvloop when it is installed.
+
+    uvloop schedules the many terminal tasks faster. The loop is driven here instead of handed to `App.run`, so this
+    works with every supported Textual version.
+    """
+    if uvloop is None:
+        app.run()
+    else:
+        uvloop.run(app.run_async())
+
+
+def start_app(config_file: Path | str | None = None) -> None:
+    """
+    Load the config and run the app, until it exits.
+
+    Both `fnug run` and the bare `fnug` fast path start the app through here. That path skips click, so interrupts are
+    reported the way click would: "Aborted!" on stderr and exit code 1.
+
+    :param config_file: The path to the config file, found automatically when not given.
+    """
+    try:
+        run_app(FnugApp.from_config_file(config_file))
+    except (EOFError, KeyboardInterrupt):
+        print("\nAborted!", file=sys.stderr)
+        sys.exit(1)
+
 
 class _CommandProvider(Provider):
-    commands: dict[str, TreeNode[LintTreeDataType]]
+    # The id and name of every command, collected once when the palette opens instead of on every keystroke
+    commands: list[tuple[str, str]]
+    # The callback for every command id, so hits don't allocate a new partial on each keystroke
+    callbacks: dict[str, Callable[[], object]]
 
     async def startup(self) -> None:
         app = self.app
         if not isinstance(app, FnugApp):
             return
 
-        self.commands = app.lint_tree.command_leafs
+        self.commands = [
+            (node_id, node.data.name) for node_id, node in app.lint_tree.command_leafs.items() if node.data
+        ]
+        self.callbacks = {node_id: partial(app.display_terminal, node_id) for node_id, _ in self.commands}
 
     async def search(self, query: str) -> Hits:
         """Search for Python files."""
@@ -44,23 +113,19 @@ class _CommandProvider(Provider):
 
         matcher = self.matcher(query)
 
-        for node_id, node in self.commands.items():
-            if not node.data:
-                continue
-
+        for node_id, name in self.commands:
             score = matcher.match(node_id)
             if score > 0:
-                callback = partial(app.display_terminal, node_id)
                 yield Hit(
                     score,
-                    match_display=matcher.highlight(node.data.name),
-                    command=callback,
-                    text=node.data.name,
+                    match_display=matcher.highlight(name),
+                    command=self.callbacks[node_id],
+                    text=name,
                     help=node_id,
                 )
 
 
-@dataclass
+@dataclass(slots=True)
 class TerminalInstance:
     """A collection of tasks and emulator for a terminal."""
 
@@ -76,13 +141,19 @@ class FnugApp(App[None]):
 
     BINDINGS: ClassVar[list[BindingType]] = [Binding("escape", "quit", "Quit", show=False)]
 
-    terminals: ClassVar[dict[str, TerminalInstance]] = {}
+    terminals: dict[str, TerminalInstance]
     active_terminal_id: str | None = None
     display_task: Worker[None] | None = None
+    _switch_timer: Timer | None = None
+    # Widgets are looked up once and then reused, as querying walks the DOM on every call
+    _lint_tree_widget: LintTree | None = None
+    _terminal_widget: Terminal | None = None
 
     def __init__(self, core: FnugCore):
         super().__init__()
         self.core = core
+        # Kept per app, so terminals are not shared between instances and are released with the app
+        self.terminals = {}
 
     @classmethod
     def from_group(cls, group: CommandGroup, cwd: Path) -> "FnugApp":
@@ -113,16 +184,24 @@ class FnugApp(App[None]):
     @property
     def lint_tree(self) -> LintTree:
         """The lint tree."""
-        return self.query_one("#lint-tree", LintTree)
+        if self._lint_tree_widget is None:
+            self._lint_tree_widget = self.query_one("#lint-tree", LintTree)
+        return self._lint_tree_widget
 
     @property
     def _terminal(self) -> Terminal:
-        return self.query_one("#terminal", Terminal)
+        if self._terminal_widget is None:
+            self._terminal_widget = self.query_one("#terminal", Terminal)
+        return self._terminal_widget
 
     @on(LintTree.NodeHighlighted, "#lint-tree")
     def _switch_terminal(self, event: LintTree.NodeHighlighted[LintTreeDataType]):
         if event.node.data is not None:
-            self.display_terminal(event.node.data.id)
+            if self._switch_timer is not None:
+                self._switch_timer.stop()
+            self._switch_timer = self.set_timer(
+                SWITCH_TERMINAL_DELAY, partial(self.display_terminal, event.node.data.id)
+            )
 
     @on(LintTree.RunCommand, "#lint-tree")
     def _action_run_command(self, event: LintTree.RunCommand):
@@ -143,9 +222,11 @@ class FnugApp(App[None]):
     def _run_all(self, event: LintTree.RunAllCommand):
         cursor_id = getattr(self.lint_tree.cursor_node, "id", None)
 
-        for node in event.nodes:
-            if node.data is not None:
-                self._run_command(node.data, background=cursor_id != node.id)
+        # Every started command updates its node (and parents) in the tree, batch them into a single screen update
+        with self.batch_update():
+            for node in event.nodes:
+                if node.data is not None:
+                    self._run_command(node.data, background=cursor_id != node.id)
 
     async def _handle_context_menu(
         self, node: TreeNode[LintTreeDataType], event: events.Click, active_node: bool = False
@@ -154,6 +235,8 @@ class FnugApp(App[None]):
             return
 
         tree = self.lint_tree
+        # Walk the group once, both the menu options and the selected action only need its commands
+        group_commands = list(all_commands(node)) if node.data.type == "group" else []
 
         def handle_selection(selection: str | None):
             if node.data is None or selection is None:
@@ -173,15 +256,15 @@ class FnugApp(App[None]):
             elif selection == "clear":
                 self._clear_terminal(node.data.id)
             elif selection == "run-all":
-                for command in all_commands(node):
+                for command in group_commands:
                     if command.data is not None:
                         self._run_command(command.data, background=cursor_id != command.id)
             elif selection == "stop-all":
-                for command in all_commands(node):
+                for command in group_commands:
                     if command.data is not None:
                         self._stop_command(command.data.id)
             elif selection == "rerun-failures":
-                for command in all_commands(node):
+                for command in group_commands:
                     if command.data is not None and command.data.status == "failure":
                         self._run_command(command.data, background=cursor_id != command.id)
             elif selection == "select-all":
@@ -189,12 +272,14 @@ class FnugApp(App[None]):
             elif selection == "deselect-all":
                 toggle_select_node(node, False)
 
+        commands: Mapping[str, str]
+        width: int | None = None
         if node.data.type == "group":
             commands = {
                 "run-all": "Run all",
             }
 
-            sums = sum_selected_commands(node)
+            sums = sum_commands(group_commands)
             if sums.running:
                 commands["stop-all"] = "Stop all"
             if sums.total != sums.selected:
@@ -205,25 +290,17 @@ class FnugApp(App[None]):
                 commands["rerun-failures"] = "Re-run failures"
 
         elif node.data.status == "running":
-            commands = {
-                "restart": "Restart",
-                "stop": "Stop",
-                "stop-clear": "Stop and clear",
-            }
+            commands, width = RUNNING_COMMAND_MENU, RUNNING_COMMAND_MENU_WIDTH
         elif node.data.status in ("failure", "success"):
-            commands = {
-                "run": "Re-run",
-                "clear": "Clear",
-            }
+            commands, width = FINISHED_COMMAND_MENU, FINISHED_COMMAND_MENU_WIDTH
         else:
-            commands = {
-                "run": "Run",
-            }
+            commands, width = PENDING_COMMAND_MENU, PENDING_COMMAND_MENU_WIDTH
 
         await self.push_screen(
             ContextMenu(
                 commands,
                 event,
+                width=width,
             ),
             handle_selection,
         )
@@ -241,9 +318,6 @@ class FnugApp(App[None]):
 
     def display_terminal(self, command_id: str):
         """Display the terminal for a command."""
-        if self.display_task is not None:
-            self.display_task.cancel()
-
         tree = self.lint_tree
 
         if tree.cursor_node and tree.cursor_node.data and tree.cursor_node.data.id != command_id:
@@ -253,15 +327,26 @@ class FnugApp(App[None]):
                 self.lint_tree.select_node(new_node)
 
         terminal_instance = self.terminals.get(command_id)
-        self.display_task = self.run_worker(
-            self._terminal.attach_emulator(terminal_instance.emulator if terminal_instance else None),
-            name="display_task",
-        )
+        emulator = terminal_instance.emulator if terminal_instance else None
+        if self.display_task is not None:
+            if self.display_task.is_running and emulator is not None and self._terminal.process is emulator:
+                # Already displayed, attaching again would only clear and redraw the same output
+                return
+            self.display_task.cancel()
+
+        self.display_task = self.run_worker(self._terminal.attach_emulator(emulator), name="display_task")
 
     def _run_command(self, command: LintTreeDataType, background: bool = False):
         if command.type != "command" or command.command is None:
             return
 
+        if command.status == "running" and command.id in self.terminals:
+            # Already running, starting it again would spawn a new process and leave the running one behind. Restarting
+            # goes through `_stop_command` first
+            if not background:
+                self.display_terminal(command.id)
+            return
+
         tree = self.lint_tree
         tree.update_status(command.id, "running")
         size = self._terminal.size
@@ -273,8 +358,9 @@ class FnugApp(App[None]):
             else:
                 tree.update_status(command.id, "success")
 
-        if command.id in self.terminals:
-            self.terminals[command.id].run_task.cancel()
+        previous = self.terminals.get(command.id)
+        if previous is not None:
+            previous.run_task.cancel()
 
         self.terminals[command.id] = TerminalInstance(
             emulator=process,
@@ -291,9 +377,10 @@ class FnugApp(App[None]):
         if command is None or command.status != "running":
             return
 
-        if command_id in self.terminals:
-            self.terminals[command_id].emulator.kill()
-            self.terminals[command_id].run_task.cancel()
+        terminal_instance = self.terminals.get(command_id)
+        if terminal_instance is not None:
+            terminal_instance.emulator.kill()
+            terminal_instance.run_task.cancel()
             tree.update_status(command_id, "failure")
 
     def _clear_terminal(self, command_id: str):
@@ -303,6 +390,7 @@ class FnugApp(App[None]):
         if command is None or command.status == "running":
             return
 
-        if command_id in self.terminals:
-            self.terminals[command_id].emulator.clear()
+        terminal_instance = self.terminals.get(command_id)
+        if terminal_instance is not None:
+            terminal_instance.emulator.clear()
             tree.update_status(command_id, "pending")
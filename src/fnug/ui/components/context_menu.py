@@ -1,3 +1,5 @@
+from collections.abc import Mapping
+
 from textual import events, on
 from textual.app import ComposeResult
 from textual.containers import Vertical
@@ -6,6 +8,11 @@ from textual.screen import ModalScreen
 from textual.widgets import Label
 
 
+def menu_width(options: Mapping[str, str]) -> int:
+    """Width of a context menu showing the given options."""
+    return max(map(len, options.values())) + 2
+
+
 class ContextMenuItem(Label):
     """A context menu item."""
 
@@ -29,9 +36,9 @@ class ContextMenu(ModalScreen[str | None]):
 
     CSS_PATH = "context_menu.tcss"
 
-    def __init__(self, options: dict[str, str], click_event: events.Click) -> None:
+    def __init__(self, options: Mapping[str, str], click_event: events.Click, width: int | None = None) -> None:
         self.options = options
-        self.width = max(len(label) for label in options.values()) + 2
+        self.width = menu_width(options) if width is None else width
         self.height = len(options)
         self.offset_x = click_event.screen_x
         self.offset_y = click_event.screen_y
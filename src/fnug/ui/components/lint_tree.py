@@ -1,6 +1,8 @@
+import asyncio
 import time
-from collections.abc import AsyncIterable, Callable, Iterator
+from collections.abc import AsyncIterable, Callable, Iterable, Iterator
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import TYPE_CHECKING, ClassVar, Literal, Optional
 
@@ -11,8 +13,9 @@ from textual.binding import Binding, BindingType
 from textual.geometry import Offset, Region
 from textual.message import Message
 from textual.reactive import Reactive
+from textual.timer import Timer
 from textual.widgets import Tree
-from textual.widgets._tree import TOGGLE_STYLE, TreeNode
+from textual.widgets._tree import TOGGLE_STYLE, NodeID, TreeNode
 from textual.worker import Worker
 
 if TYPE_CHECKING:
@@ -21,7 +24,28 @@ if TYPE_CHECKING:
 StatusType = Literal["success", "failure", "running", "pending"]
 
 
-@dataclass
+# Delay before status changes are shown, so a burst of them is refreshed once
+STATUS_UPDATE_DELAY = 1 / 60
+
+# Styles used when rendering labels, created once instead of for every rendered line
+COUNT_STYLE = Style(color="#808080")
+SUCCESS_STYLE = Style(color="green")
+FAILURE_STYLE = Style(color="red")
+RUNNING_STYLE = Style(color="yellow")
+STATUS_ICONS: dict[StatusType | None, tuple[str, Style]] = {
+    "success": (" ✔ ", SUCCESS_STYLE),
+    "failure": (" ✘ ", FAILURE_STYLE),
+    "running": (" 🕑", RUNNING_STYLE),
+}
+
+
+@lru_cache(maxsize=1024)
+def _toggle_select_click_style(line: int) -> Style:
+    """Style that toggles the selection of the command on a line when clicked."""
+    return Style(meta={"@mouse.up": f"toggle_select_click({line})"})
+
+
+@dataclass(slots=True)
 class LintTreeDataType:
     """Data type used by the lint tree."""
 
@@ -36,10 +60,23 @@ class LintTreeDataType:
 
 def update_node(node: TreeNode[LintTreeDataType]):
     """Update/refresh a node (recursively)."""
-    node.expand()
-    node.refresh()
-    if node.parent:
-        update_node(node.parent)
+    current: TreeNode[LintTreeDataType] | None = node
+    while current is not None:
+        current.expand()
+        current.refresh()
+        current = current.parent
+
+
+def update_nodes(nodes: Iterable[TreeNode[LintTreeDataType]]):
+    """Update/refresh several nodes and their parents, refreshing shared parents only once."""
+    updated: set[NodeID] = set()
+    for node in nodes:
+        current: TreeNode[LintTreeDataType] | None = node
+        while current is not None and current.id not in updated:
+            updated.add(current.id)
+            current.expand()
+            current.refresh()
+            current = current.parent
 
 
 def select_node(node: TreeNode[LintTreeDataType]):
@@ -70,36 +107,40 @@ def toggle_select_node(node: TreeNode[LintTreeDataType], override_value: bool |
     node.data.selected = override_value
     update_node(node)
 
-    for child in node.children:
+    # The parents of every descendant are either in the subtree or already updated above, so only the descendants
+    # themselves need updating, instead of walking up to the root from each of them
+    stack = list(node.children)
+    while stack:
+        child = stack.pop()
         if not child.data:
             continue
 
-        toggle_select_node(child, override_value=override_value)
+        child.data.selected = override_value
+        child.expand()
+        child.refresh()
+        stack.extend(child.children)
 
 
 def all_commands(source_node: TreeNode[LintTreeDataType]) -> Iterator[TreeNode[LintTreeDataType]]:
     """Get all command children of a node (recursively)."""
-    for child in source_node.children:
-        if child.data and child.data.type == "command":
-            yield child
-        yield from all_commands(child)
-
-
-def toggle_all_commands(source_node: TreeNode[LintTreeDataType], commands: list["Command"]):
-    """Toggle all commands in a list."""
-    for node in all_commands(source_node):
-        if node.data and node.data.command in commands:
-            toggle_select_node(node)
+    # Walk the tree with an explicit stack, nested generators would pass every node up through each level of the tree
+    stack = list(reversed(source_node.children))
+    while stack:
+        node = stack.pop()
+        if node.data and node.data.type == "command":
+            yield node
+        stack.extend(reversed(node.children))
 
 
 def select_all_commands(source_node: TreeNode[LintTreeDataType], commands: list["Command"]):
     """Select all commands (recursively)."""
+    command_ids = {command.id for command in commands}
     for node in all_commands(source_node):
-        if node.data and node.data.command in commands:
+        if node.data and node.data.id in command_ids:
             select_node(node)
 
 
-@dataclass
+@dataclass(slots=True)
 class CommandSum:
     """A summary of the status of all selected commands."""
 
@@ -110,30 +151,29 @@ class CommandSum:
     total: int = 0
 
 
-def sum_selected_commands(source_node: TreeNode[LintTreeDataType]) -> CommandSum:
-    """Summarize the status of all selected commands (recursively)."""
+def sum_commands(commands: Iterable[TreeNode[LintTreeDataType]]) -> CommandSum:
+    """Summarize the status of a collection of command nodes."""
     command_sum = CommandSum()
-    for child in source_node.children:
-        if child.data and child.data.type == "command":
-            command_sum.total += 1
-            if child.data.selected:
-                command_sum.selected += 1
-            if child.data.status == "running":
-                command_sum.running += 1
-            elif child.data.status == "success":
-                command_sum.success += 1
-            elif child.data.status == "failure":
-                command_sum.failure += 1
-        else:
-            child_sum = sum_selected_commands(child)
-            command_sum.total += child_sum.total
-            command_sum.selected += child_sum.selected
-            command_sum.running += child_sum.running
-            command_sum.success += child_sum.success
-            command_sum.failure += child_sum.failure
+    for command in commands:
+        if command.data is None:
+            continue
+        command_sum.total += 1
+        if command.data.selected:
+            command_sum.selected += 1
+        if command.data.status == "running":
+            command_sum.running += 1
+        elif command.data.status == "success":
+            command_sum.success += 1
+        elif command.data.status == "failure":
+            command_sum.failure += 1
     return command_sum
 
 
+def sum_selected_commands(source_node: TreeNode[LintTreeDataType]) -> CommandSum:
+    """Summarize the status of all selected commands (recursively)."""
+    return sum_commands(all_commands(source_node))
+
+
 def attach_command(
     tree: TreeNode[LintTreeDataType],
     command_group: "CommandGroup",
@@ -176,9 +216,14 @@ class LintTree(Tree[LintTreeDataType]):
     guide_depth = 3
     show_root = False
     watch_task: Worker[None] | None = None
+    select_git_task: Worker[None] | None = None
     grabbed: Reactive[Offset | None] = Reactive(None)
     last_click: Reactive[dict[int, float | Literal["invalid"]]] = Reactive({})  # used for double click detection
-    command_leafs: Reactive[dict[str, TreeNode[LintTreeDataType]]] = Reactive({})
+    # Built once when the tree is set up, the tree structure doesn't change afterwards. A plain attribute, as it's read
+    # on every status update and palette search, and nothing needs to react to it being set
+    command_leafs: dict[str, TreeNode[LintTreeDataType]]
+    _pending_updates: dict[str, TreeNode[LintTreeDataType]]
+    _update_timer: Timer | None = None
 
     BINDINGS: ClassVar[list[BindingType]] = [
         # Movement
@@ -281,6 +326,8 @@ class LintTree(Tree[LintTreeDataType]):
         self.core = core
         self.config = core.config
         self.cwd = core.cwd
+        self.command_leafs = {}
+        self._pending_updates = {}
 
     def _get_label_region(self, line: int) -> Region | None:
         """Like parent, but offset by 2 to account for the icon."""
@@ -298,7 +345,16 @@ class LintTree(Tree[LintTreeDataType]):
         node.data.status = status
         if status == "success":
             node.data.selected = False
-        update_node(node)
+
+        # Commands often change status in bursts (eg. when running all), refresh them together on the next frame
+        self._pending_updates[command_id] = node
+        if self._update_timer is None:
+            self._update_timer = self.set_timer(STATUS_UPDATE_DELAY, self._flush_status_updates)
+
+    def _flush_status_updates(self):
+        self._update_timer = None
+        nodes, self._pending_updates = self._pending_updates, {}
+        update_nodes(nodes.values())
 
     def get_command(self, command_id: str) -> LintTreeDataType | None:
         """Get a command by ID."""
@@ -324,11 +380,15 @@ class LintTree(Tree[LintTreeDataType]):
             return
         self.post_message(self.StopCommand(self.cursor_node))
 
-    def action_run_all(self) -> None:
+    async def action_run_all(self) -> None:
         """Run all selected commands."""
+        # The initial git selection runs in the background, wait for it so the commands it selects are run too
+        if self.select_git_task is not None:
+            await self.select_git_task.wait()
+        # The command leafs are every command of the tree in tree order, so there is no need to walk it
         nodes = [
             node
-            for node in all_commands(self.root)
+            for node in self.command_leafs.values()
             if node.data and node.data.selected and node.data.status not in ["running"]
         ]
         if len(nodes) > 0:
@@ -361,10 +421,13 @@ class LintTree(Tree[LintTreeDataType]):
 
         toggle_select_node(self.cursor_node)
 
-    def action_select_git(self):
+    async def action_select_git(self):
         """Select all git auto commands."""
-        changed_commands = self.core.selected_commands()
-        toggle_all_commands(self.root, changed_commands)
+        # Detecting changes scans every watched repository, run it in a thread so the UI stays responsive meanwhile
+        for command in await asyncio.to_thread(self.core.selected_commands):
+            node = self.command_leafs.get(command.id)
+            if node is not None:
+                toggle_select_node(node)
 
     def action_toggle_select_click(self, line: int, node: TreeNode[LintTreeDataType] | None = None):
         """Toggle a node on click."""
@@ -429,64 +492,37 @@ class LintTree(Tree[LintTreeDataType]):
 
         if node._allow_expand:  # pyright: ignore reportPrivateUsage=false
             command_sum = sum_selected_commands(node)
-            count_style = base_style + Style(color="#808080")
-
-            group_count_pieces = [
-                Text(" (", count_style),
-                Text(str(command_sum.selected), count_style),
-                Text("/", count_style),
-                Text(str(command_sum.total), count_style),
-                Text(")", count_style),
-            ]
+            count_style = base_style + COUNT_STYLE
 
-            if any([command_sum.running, command_sum.success, command_sum.failure]):
-                status_count_pieces = [Text(" [", count_style)]
+            # Build the counts into a single Text, instead of assembling one Text per piece
+            group_count = Text()
+            if command_sum.running or command_sum.success or command_sum.failure:
+                group_count.append(" [", count_style)
 
                 if command_sum.success:
-                    status_count_pieces.append(Text(str(command_sum.success), base_style + Style(color="green")))
+                    group_count.append(str(command_sum.success), base_style + SUCCESS_STYLE)
                     if command_sum.running or command_sum.failure:
-                        status_count_pieces.append(Text("|", count_style))
+                        group_count.append("|", count_style)
 
                 if command_sum.running:
-                    status_count_pieces.append(Text(str(command_sum.running), count_style))
+                    group_count.append(str(command_sum.running), count_style)
                     if command_sum.failure:
-                        status_count_pieces.append(Text("|", count_style))
+                        group_count.append("|", count_style)
 
                 if command_sum.failure:
-                    status_count_pieces.append(Text(str(command_sum.failure), base_style + Style(color="red")))
+                    group_count.append(str(command_sum.failure), base_style + FAILURE_STYLE)
 
-                status_count_pieces.append(Text("]", count_style))
+                group_count.append("]", count_style)
 
-                group_count_pieces = [
-                    *status_count_pieces,
-                    *group_count_pieces,
-                ]
-
-            group_count = Text.assemble(*group_count_pieces)
+            group_count.append(f" ({command_sum.selected}/{command_sum.total})", count_style)
             dropdown = ("▼ ", base_style + TOGGLE_STYLE) if node.is_expanded else ("▶ ", base_style + TOGGLE_STYLE)
 
-        command_status = getattr(node.data, "status", "")
-        if command_status == "success":
-            status = (" ✔ ", base_style + Style(color="green"))
-        elif command_status == "failure":
-            status = (" ✘ ", base_style + Style(color="red"))
-        elif command_status == "running":
-            status = (" 🕑", base_style + Style(color="yellow"))
-        else:
-            status = ("", base_style)
-
-        selected = getattr(node.data, "selected", False)
-        is_command = getattr(node.data, "type", "") == "command"
-        if selected and is_command:
-            selection = (
-                "● ",
-                base_style + Style(meta={"@mouse.up": f"toggle_select_click({node.line})"} if node.data else {}),
-            )
-        elif is_command:
-            selection = (
-                "○ ",
-                base_style + Style(meta={"@mouse.up": f"toggle_select_click({node.line})"} if node.data else {}),
-            )
+        data = node.data
+        status_icon = STATUS_ICONS.get(data.status) if data is not None else None
+        status = (status_icon[0], base_style + status_icon[1]) if status_icon else ("", base_style)
+
+        if data is not None and data.type == "command":
+            selection = ("● " if data.selected else "○ ", base_style + _toggle_select_click_style(node.line))
         else:
             selection = ("", base_style)
 
@@ -494,7 +530,7 @@ class LintTree(Tree[LintTreeDataType]):
 
     def _setup(self):
         self.command_leafs = attach_command(self.root, self.config, self.cwd, root=True)
-        self.action_select_git()
+        self.select_git_task = self.run_worker(self.action_select_git())
         self.watch_task = self.run_worker(watch_auto_task(self.root, self.core.watch))
 
     def _on_mount(self, event: events.Mount):
@@ -1,6 +1,8 @@
 import asyncio
+from functools import lru_cache
 from typing import ClassVar
 
+from rich.ansi import AnsiDecoder
 from rich.console import Console, ConsoleOptions, ConsoleRenderable, RenderResult
 from rich.text import Text
 from textual import events
@@ -49,6 +51,21 @@ CTRL_KEYS: dict[str, str] = {
     Keys.ControlF20: "\x1b[34~",
 }
 
+# Minimum time between two renders of the terminal output, output arriving in between is coalesced into the next frame
+FRAME_INTERVAL = 1 / 60
+
+
+@lru_cache(maxsize=4096)
+def _decode_row(row: str) -> Text:
+    """
+    Decode a single formatted terminal row.
+
+    Most rows are unchanged between two frames, so the decoded rows are cached. Each row is formatted starting from
+    the default attributes, which makes it safe to decode them independently.
+    """
+    # Decode the row directly, `Text.from_ansi` would split and re-join it
+    return AnsiDecoder().decode_line(row)
+
 
 class TerminalDisplay(ConsoleRenderable):
     """Rich display for the terminal."""
@@ -61,7 +78,7 @@ class TerminalDisplay(ConsoleRenderable):
     @classmethod
     def from_ansi(cls, ansi: list[str]):
         """Create a TerminalDisplay from an ANSI string."""
-        return cls([Text.from_ansi(line) for line in ansi])
+        return cls([_decode_row(line) for line in ansi])
 
     def __rich_console__(self, console: Console, options: ConsoleOptions) -> RenderResult:
         """Render the terminal display."""
@@ -72,6 +89,10 @@ class Terminal(Widget, can_focus=False):
     """Terminal textual widget."""
 
     process: Process | None = None
+    # The size the attached process was last resized to
+    _process_size: Size | None = None
+    # The scrollback size, position and widget height the scrollbar was last set up for
+    _scrollbar_state: tuple[int, int, int] | None = None
     show_vertical_scrollbar = reactive(True)
 
     BINDINGS: ClassVar[list[BindingType]] = [
@@ -104,6 +125,7 @@ class Terminal(Widget, can_focus=False):
         classes: str | None = None,
     ) -> None:
         self.terminal_display = TerminalDisplay()
+        self.scrollbar = ScrollBar()
 
         super().__init__(name=name, id=id, classes=classes)
 
@@ -118,7 +140,7 @@ class Terminal(Widget, can_focus=False):
         Then a compose method is combined with a render, the render method will be used as a "background"
         https://textual.textualize.io/how-to/render-and-compose/
         """
-        yield ScrollBar()
+        yield self.scrollbar
 
     def clear(self):
         """Clear the terminal display."""
@@ -127,7 +149,13 @@ class Terminal(Widget, can_focus=False):
 
     def set_scrollbar(self, size: int, current: int):
         """Set the scrollbar position."""
-        scrollbar = self.query_one(ScrollBar)
+        # This runs for every frame, but the scrollbar only changes when scrolling or when the scrollback grows
+        state = (size, current, self.size.height)
+        if state == self._scrollbar_state:
+            return
+        self._scrollbar_state = state
+
+        scrollbar = self.scrollbar
 
         scrollbar.styles.display = "none" if size == 0 else "block"
         scrollbar.window_size = self.size.height
@@ -138,17 +166,23 @@ class Terminal(Widget, can_focus=False):
     async def attach_emulator(self, process: Process | None):
         """Attach a terminal emulator to this widget."""
         self.process = process
+        self._process_size = None
+        self._scrollbar_state = None
         self.can_focus = process.can_focus if process else False
-        self.clear()
 
         if not process:
+            self.clear()
             return
 
+        # The first output is the current screen of the process, and replaces the previous one in a single refresh,
+        # so don't clear the display in between
         try:
             async for output in process.output:
                 self.terminal_display = TerminalDisplay.from_ansi(output.screen)
                 self.set_scrollbar(output.scrollback_size, output.scrollback_position)
                 self.refresh()
+                # The output channel only keeps the latest screen, so waiting here skips the intermediate ones
+                await asyncio.sleep(FRAME_INTERVAL)
         except asyncio.CancelledError:
             pass
 
@@ -194,8 +228,11 @@ class Terminal(Widget, can_focus=False):
         self.call_after_refresh(self._on_resize)
 
     async def _on_resize(self, event: events.Resize | None = None):
-        if self.process:
-            self.process.resize(self.size.width, self.size.height)
+        size = self.size
+        # Resizing the pty signals the process, which then usually redraws, so skip it if nothing changed
+        if self.process and size != self._process_size:
+            self._process_size = size
+            self.process.resize(size.width, size.height)
 
     def _on_scroll_down(self, event: ScrollDown) -> None:
         if self.process is not None:
@@ -207,7 +244,7 @@ class Terminal(Widget, can_focus=False):
 
     def _on_scroll_to(self, message: ScrollTo) -> None:
         if self.process is not None and message.y is not None:
-            scrollbar = self.query_one(ScrollBar)
+            scrollbar = self.scrollbar
             minimum = 0
             maximum = scrollbar.window_virtual_size - self.size.height
 
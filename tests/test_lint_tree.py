@@ -3,11 +3,22 @@ from unittest.mock import Mock
 from rich.text import Text
 from textual.widgets._tree import NodeID, Tree, TreeNode
 
-from fnug.ui.components.lint_tree import LintTreeDataType, select_node, toggle_select_node, update_node
-
-
-def _create_node(parent=None):
-    node = TreeNode(Tree(""), parent, NodeID(1), Text(""), data=LintTreeDataType("1", "1", "command"))
+from fnug.ui.components.lint_tree import (
+    LintTreeDataType,
+    all_commands,
+    select_all_commands,
+    select_node,
+    sum_selected_commands,
+    toggle_select_node,
+    update_node,
+    update_nodes,
+)
+
+
+def _create_node(parent=None, node_id="1", tree_node_id=1):
+    node = TreeNode(
+        Tree(""), parent, NodeID(tree_node_id), Text(""), data=LintTreeDataType(node_id, node_id, "command")
+    )
     if parent:
         parent._children.append(node)
     return node
@@ -56,6 +67,22 @@ class TestUpdateNode:
         assert child.refresh.called is False
 
 
+class TestUpdateNodes:
+    def test_shared_parent_refreshed_once(self):
+        parent = _create_node()
+        first = _create_node(parent=parent, tree_node_id=2)
+        second = _create_node(parent=parent, tree_node_id=3)
+        parent.refresh = Mock()
+        first.refresh = Mock()
+        second.refresh = Mock()
+
+        update_nodes([first, second])
+
+        assert first.refresh.call_count == 1
+        assert second.refresh.call_count == 1
+        assert parent.refresh.call_count == 1
+
+
 class TestSelectNode:
     def test_select_node(self):
         node = _create_node()
@@ -88,3 +115,59 @@ class TestToggleSelectNode:
 
         assert node.data.selected is True
         assert child.data.selected is True
+
+    def test_grandchildren_are_refreshed(self):
+        node = _create_node()
+        child = _create_node(parent=node)
+        grandchild = _create_node(parent=child)
+        grandchild.refresh = Mock()
+
+        toggle_select_node(node)
+
+        assert grandchild.data.selected is True
+        assert grandchild.refresh.called is True
+
+
+class TestSelectAllCommands:
+    def test_selects_matching_ids(self):
+        root = _create_node()
+        first = _create_node(parent=root, node_id="first")
+        second = _create_node(parent=root, node_id="second")
+
+        select_all_commands(root, [Mock(id="second")])
+
+        assert first.data.selected is False
+        assert second.data.selected is True
+
+
+class TestAllCommands:
+    def test_depth_first_order(self):
+        root = _create_node()
+        first = _create_node(parent=root, node_id="first")
+        nested = _create_node(parent=first, node_id="nested")
+        second = _create_node(parent=root, node_id="second")
+
+        assert list(all_commands(root)) == [first, nested, second]
+
+    def test_excludes_source_node(self):
+        root = _create_node()
+
+        assert list(all_commands(root)) == []
+
+
+class TestSumSelectedCommands:
+    def test_counts_nested_commands(self):
+        root = _create_node()
+        group = TreeNode(Tree(""), root, NodeID(1), Text(""), data=LintTreeDataType("group", "group", "group"))
+        root._children.append(group)
+        selected = _create_node(parent=group, node_id="selected")
+        failed = _create_node(parent=root, node_id="failed")
+        selected.data.selected = True
+        failed.data.status = "failure"
+
+        command_sum = sum_selected_commands(root)
+
+        assert command_sum.total == 2
+        assert command_sum.selected == 1
+        assert command_sum.failure == 1
+        assert command_sum.running == 0